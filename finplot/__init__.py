@@ -17,7 +17,7 @@ from collections import OrderedDict, defaultdict
 from datetime import datetime, timezone
 from dateutil.tz import tzlocal
 from decimal import Decimal
-from functools import partial, partialmethod
+from functools import lru_cache, partial, partialmethod
 from finplot.live import Live
 from math import ceil, floor, fmod
 import numpy as np
@@ -65,6 +65,9 @@ right_margin_candles = 5 # whitespace at the right-hand side
 side_margin = 0.5
 lod_candles = 3000
 lod_labels = 700
+hilo_block = 1024 # rows per precomputed hi/lo block, for hilo over long ranges
+use_numba = False # compile the hi/lo scan with numba, if installed; the first scan pays for the compilation
+crosshair_rate = 60 # max crosshair updates per second; mouse moves in between are coalesced
 cache_candle_factor = 3 # factor extra candles rendered to buffer
 y_pad = 0.03 # 3% padding at top and bottom of autozoom plots
 y_label_width = 65
@@ -85,6 +88,7 @@ windows = [] # no gc
 timers = [] # no gc
 sounds = {} # no gc
 epoch_period = 1e30
+local_t_tz = None # timezone the cached local time strings were made with
 last_ax = None # always assume we want to plot in the last axis, unless explicitly specified
 overlay_axs = [] # for keeping track of candlesticks in overlays
 viewrestore = False
@@ -118,7 +122,7 @@ class EpochAxisItem(pg.AxisItem):
         if datasrc is None or not self.vb.x_indexed:
             return super().tickValues(minVal, maxVal, size)
         # calculate if we use years, days, etc.
-        t0,t1,_,_,_ = datasrc.hilo(minVal, maxVal)
+        t0,t1 = datasrc.time_range(minVal, maxVal)
         t0,t1 = pd.to_datetime(t0), pd.to_datetime(t1)
         dts = (t1-t0).total_seconds()
         gfx_width = int(size)
@@ -252,9 +256,12 @@ class PandasDataSource:
        Volume bars: create with three columns: time, open, close, volume - in that order.
        For all other types, time needs to be first, usually followed by one or more Y-columns.'''
     def __init__(self, df):
+        # the caches assume nobody else writes to our data, so take a copy; reset_index already makes one
         if type(df.index) == pd.DatetimeIndex or df.index[-1]>1e8 or '.RangeIndex' not in str(type(df.index)):
             df = df.reset_index()
-        self.df = df.copy()
+        else:
+            df = df.copy()
+        self.df = df
         # manage time column
         if _has_timecol(self.df):
             timecol = self.df.columns[0]
@@ -269,7 +276,6 @@ class PandasDataSource:
             self.col_data_offset = 0 # no. of preceeding columns for other plots and time column
         # setup data for joining data sources and zooming
         self.scale_cols = [i for i in range(self.col_data_offset,len(self.df.columns)) if self.df.iloc[:,i].dtype!=object]
-        self.cache_hilo = OrderedDict()
         self.renames = {}
         newcols = []
         for col in self.df.columns:
@@ -283,15 +289,24 @@ class PandasDataSource:
         self.pre_update = lambda df: df
         self.post_update = lambda df: df
         self._period = None
-        self._smooth_time = None
+        self._clear_cache()
         self.is_sparse = self.df[self.df.columns[self.col_data_offset]].isnull().sum().max() > len(self.df)//2
 
+    @property
+    def scale_cols(self):
+        return self._scale_cols
+
+    @scale_cols.setter
+    def scale_cols(self, cols):
+        self._scale_cols = cols
+        self.cache_hilo = OrderedDict() # hi/lo columns changed
+        self._val_arr = self._last_hilo = self._block_hilo = None
+
     @property
     def period_ns(self):
-        if len(self.df) <= 1:
-            return 1
-        if not self._period:
-            self._period = self.calc_period_ns()
+        if self._period is None: # cleared whenever the leading timestamps change
+            self._period = self.calc_period_ns() if len(self.df) > 1 else 1
+            self._period_head = self.df.iloc[:100,0].values.copy()
         return self._period
 
     def calc_period_ns(self, n=100, delta=lambda dt: int(dt.median())):
@@ -332,20 +347,19 @@ class PandasDataSource:
                 c = abs(c-b)
             return c < b*0.6 # half is fine
         def calc_sd(ser):
-            ser = ser.iloc[:1000]
-            absdiff = ser.diff().abs()
-            absdiff[absdiff<1e-30] = 1e30
-            smallest_diff = absdiff.min()
-            if smallest_diff > 1e29: # just 0s?
+            vals = ser.values[:1000].astype(np.float64)
+            absdiff = np.abs(np.diff(vals))
+            absdiff = absdiff[absdiff>=1e-30] # also drops NaNs
+            if not len(absdiff): # just 0s?
                 return 0
-            smallest_diff = float_round(smallest_diff)
-            absser = ser.iloc[:100].abs()
+            smallest_diff = float_round(absdiff.min())
+            absser = np.abs(vals[:100])
             for _ in range(2): # check if we have a remainder that is a better epsilon
-                remainder = [fmod(v,smallest_diff) for v in absser]
-                remainder = [v for v in remainder if v>smallest_diff/20]
-                if not remainder:
+                remainder = np.fmod(absser, smallest_diff)
+                remainder = remainder[remainder>smallest_diff/20]
+                if not len(remainder):
                     break
-                smallest_diff_r = min(remainder)
+                smallest_diff_r = remainder.min()
                 if smallest_diff*0.05 < smallest_diff_r < smallest_diff * 0.7 and remainder_ok(smallest_diff, smallest_diff_r):
                     smallest_diff = smallest_diff_r
                 else:
@@ -381,8 +395,36 @@ class PandasDataSource:
         self.init_x0, self.init_x1 = _xminmax(self, x_indexed=True, init_steps=init_steps)
 
     def closest_time(self, x):
-        timecol = self.df.columns[0]
-        return self.df.loc[int(x), timecol]
+        x = int(x)
+        idx = self._index_arr
+        if idx is not None and idx is not False: # the crosshair mostly moves a row at a time, so check next to the last hit first
+            for i in (self._closest_i, self._closest_i+1, self._closest_i-1):
+                if 0 <= i < len(idx) and idx[i] == x and (i == 0 or idx[i-1] != x):
+                    self._closest_i = i
+                    return self._time_arr[i]
+        if idx is None: # populate the cached arrays
+            self._index_slice(x, x)
+            idx = self._index_arr
+        if idx is False:
+            i0,i1 = self.df.index.slice_locs(x, x)
+        else: # a single left search finds the first row of x, if there is one
+            i0 = int(np.searchsorted(idx, x, side='left'))
+            i1 = i0+1 if i0 < len(idx) and idx[i0] == x else i0
+        if i1 <= i0:
+            raise KeyError(x)
+        self._closest_i = i0
+        return self._time_arr[i0]
+
+    def edge_time(self, last):
+        '''Return the first or last time, straight from the cached time column.'''
+        if self._time_arr is None:
+            self._index_slice(0, 0) # populate the cached arrays
+        return self._time_arr[-1 if last else 0]
+
+    def x_minmax(self):
+        if self._x_minmax is None: # full column scan, so only once per data change
+            self._x_minmax = self.x.min(), self.x.max()
+        return self._x_minmax
 
     def timebased(self):
         return self.df.iloc[-1,0] > 1e7
@@ -397,33 +439,51 @@ class PandasDataSource:
         new_scale_cols = [c+len(self.df.columns)-datasrc.col_data_offset for c in datasrc.scale_cols]
         self.scale_cols += new_scale_cols
         orig_col_data_cnt = len(self.df.columns)
+        same_times = False
         if _has_timecol(datasrc.df):
             timecol = self.df.columns[0]
-            df = self.df.set_index(timecol)
+            times = self.df[timecol].values
             timecol = timecol if timecol in datasrc.df.columns else datasrc.df.columns[0]
-            newcols = datasrc.df.set_index(timecol)
+            # overlays on the same x-axis usually have identical (and unique) timestamps, then there is nothing to join
+            same_times = np.array_equal(times, datasrc.df[timecol].values) and (np.diff(times) > 0).all()
+            if same_times:
+                df = self.df
+                newcols = datasrc.df
+                srccols = [col for col in datasrc.df.columns if col != timecol]
+            else:
+                df = self.df.set_index(self.df.columns[0])
+                newcols = datasrc.df.set_index(timecol)
+                srccols = list(newcols.columns)
         else:
             df = self.df
             newcols = datasrc.df
-        cols = list(newcols.columns)
+            srccols = list(newcols.columns)
+        cols = list(srccols)
+        existing = set(self.df.columns) # hashed lookups, as overlays may pile up many columns
         for i,col in enumerate(cols):
             old_col = col
-            while col in self.df.columns:
+            while col in existing:
                 cols[i] = col = str(col)+'+'
+            existing.add(col)
             if old_col != col:
                 datasrc.renames[old_col] = col
-        newcols.columns = cols
-        self.df = df.join(newcols, how='outer')
-        if _has_timecol(datasrc.df):
-            self.df.reset_index(inplace=True)
+        if same_times:
+            self.df = df.copy(deep=False) # add columns without touching the frame other data sources hold
+            self.df.index = pd.RangeIndex(len(df))
+            for col,srccol in zip(cols, srccols):
+                self.df[col] = newcols[srccol].values
+        else:
+            newcols.columns = cols
+            self.df = df.join(newcols, how='outer')
+            if _has_timecol(datasrc.df):
+                self.df.reset_index(inplace=True)
         datasrc.df = self.df # they are the same now
         datasrc.init_x0 = self.init_x0
         datasrc.init_x1 = self.init_x1
         datasrc.col_data_offset = orig_col_data_cnt
         datasrc.scale_cols = new_scale_cols
-        self.cache_hilo = OrderedDict()
-        self._period = self._smooth_time = None
-        datasrc._period = datasrc._smooth_time = None
+        self._clear_cache()
+        datasrc._clear_cache()
         ldf2 = len(self.df) // 2
         self.is_sparse = self.is_sparse or self.df[self.df.columns[self.col_data_offset]].isnull().sum().max() > ldf2
         datasrc.is_sparse = datasrc.is_sparse or datasrc.df[datasrc.df.columns[datasrc.col_data_offset]].isnull().sum().max() > ldf2
@@ -453,55 +513,114 @@ class PandasDataSource:
         output_df = output_df.reset_index()
         self.df = output_df[[output_df.columns[0]]+orig_cols] if orig_cols else output_df
         self.init_x1 = self.xlen + right_margin_candles - side_margin
-        self.cache_hilo = OrderedDict()
-        self._period = self._smooth_time = None
+        self._clear_cache()
 
     def set_df(self, df):
         self.df = df
+        self._clear_cache()
+
+    def _clear_cache(self):
         self.cache_hilo = OrderedDict()
-        self._period = self._smooth_time = None
+        # appending doesn't touch the leading rows the period is calculated from, so keep it then
+        if self._period is not None and not np.array_equal(self._period_head, self.df.iloc[:100,0].values):
+            self._period = None
+        self._smooth_time = None
+        self._index_arr = self._time_arr = self._val_arr = self._last_hilo = self._block_hilo = None
+        self._closest_i = 0
+        self._x_minmax = None
 
     def hilo(self, x0, x1):
         '''Return five values in time range: t0, t1, highest, lowest, number of rows.'''
-        if x0 == x1:
-            x0 = x1 = int(x1)
-        else:
-            x0,x1 = int(x0+0.5),int(x1)
-        query = '%i,%i' % (x0,x1)
+        # key on the resulting row range, so nearby x's covering the same rows share the entry
+        query = i0,i1 = self._hilo_slice(x0, x1)
         if query not in self.cache_hilo:
-            v = self.cache_hilo[query] = self._hilo(x0, x1)
+            v = self.cache_hilo[query] = self._hilo(i0, i1)
         else:
-            # re-insert to raise prio
-            v = self.cache_hilo[query] = self.cache_hilo.pop(query)
+            # raise prio
+            v = self.cache_hilo[query]
+            self.cache_hilo.move_to_end(query)
         if len(self.cache_hilo) > 100: # drop if too many
-            del self.cache_hilo[next(iter(self.cache_hilo))]
+            self.cache_hilo.popitem(last=False)
         return v
 
-    def _hilo(self, x0, x1):
-        df = self.df.loc[x0:x1, :]
-        if not len(df):
+    def time_range(self, x0, x1):
+        '''Return the first two values of hilo(), without scanning (or caching) the values.'''
+        i0,i1 = self._hilo_slice(x0, x1)
+        if i1 <= i0:
+            return 0,0
+        return self._time_arr[i0],self._time_arr[i1-1]
+
+    def _hilo_slice(self, x0, x1):
+        if x0 == x1:
+            x0 = x1 = int(x1)
+        else:
+            x0,x1 = int(x0+0.5),int(x1)
+        return self._index_slice(x0, x1)
+
+    def _hilo(self, i0, i1):
+        if i1 <= i0:
             return 0,0,0,0,0
-        timecol = df.columns[0]
-        t0 = df[timecol].iloc[0]
-        t1 = df[timecol].iloc[-1]
-        valcols = df.columns[self.scale_cols]
-        hi = df[valcols].max().max()
-        lo = df[valcols].min().min()
-        return t0,t1,hi,lo,len(df)
+        times = self._time_arr
+        if self._val_arr is None:
+            self._val_arr = np.ascontiguousarray(self.df.iloc[:, self.scale_cols].values, dtype=np.float64)
+        last = self._last_hilo
+        if last and last[0] == i0 and last[1] <= i1: # same start, only grown to the right: just scan the new tail
+            hi,lo = self._scan_hilo(self._val_arr[last[1]:i1])
+            hi,lo = np.fmax(last[2], hi), np.fmin(last[3], lo)
+        else:
+            hi,lo = self._range_hilo(i0, i1)
+        self._last_hilo = (i0, i1, hi, lo)
+        return times[i0],times[i1-1],hi,lo,i1-i0
+
+    def _range_hilo(self, i0, i1):
+        b0,b1 = -(-i0//hilo_block), i1//hilo_block # whole blocks inside the range
+        vals = self._val_arr
+        if b1-b0 < 2 or not vals.shape[1]:
+            return self._scan_hilo(vals[i0:i1])
+        if self._block_hilo is None:
+            blocks = vals[:len(vals)//hilo_block*hilo_block].reshape(-1, hilo_block*vals.shape[1])
+            self._block_hilo = np.fmax.reduce(blocks, axis=1), np.fmin.reduce(blocks, axis=1)
+        bhi,blo = self._block_hilo
+        # only the partial blocks at the ends are scanned row by row
+        hi0,lo0 = self._scan_hilo(vals[i0:b0*hilo_block])
+        hi1,lo1 = self._scan_hilo(vals[b1*hilo_block:i1])
+        hi = np.fmax(np.fmax(hi0, hi1), np.fmax.reduce(bhi[b0:b1]))
+        lo = np.fmin(np.fmin(lo0, lo1), np.fmin.reduce(blo[b0:b1]))
+        return hi,lo
+
+    def _scan_hilo(self, vals):
+        kernel = _get_hilo_kernel() if use_numba else None
+        if kernel:
+            return kernel(vals)
+        if vals.size:
+            return np.fmax.reduce(vals, axis=None), np.fmin.reduce(vals, axis=None) # NaN-ignoring, like pandas
+        return np.nan, np.nan
+
+    def _index_slice(self, x0, x1):
+        '''Return row positions [i0,i1) for the inclusive index label range x0..x1, same as df.loc[x0:x1].'''
+        if self._time_arr is None:
+            self._time_arr = self.df.iloc[:, 0].values
+            index = self.df.index
+            self._index_arr = index.values if index.is_monotonic_increasing else False
+        if self._index_arr is False: # unsorted index, let pandas figure it out
+            return self.df.index.slice_locs(x0, x1)
+        return int(np.searchsorted(self._index_arr, x0, side='left')), int(np.searchsorted(self._index_arr, x1, side='right'))
 
     def rows(self, colcnt, x0, x1, yscale, lod=True, resamp=None):
-        df = self.df.loc[x0:x1, :]
+        i0,i1 = self._index_slice(x0, x1) # same rows as .loc[x0:x1], but through the cached index array
+        df = self.df.iloc[i0:i1]
         if self.is_sparse:
             df = df.loc[df.iloc[:,self.col_data_offset].notna(), :]
         origlen = len(df)
         return self._rows(df, colcnt, yscale=yscale, lod=lod, resamp=resamp), origlen
 
     def _rows(self, df, colcnt, yscale, lod, resamp):
-        if lod and len(df) > lod_candles:
+        limit = lod_candles if lod is True else lod # lod may also be a max row count
+        if lod and len(df) > limit:
             if resamp:
-                df = self._resample(df, colcnt, resamp)
+                df = self._resample(df, colcnt, resamp, limit)
             else:
-                df = df.iloc[::len(df)//lod_candles]
+                df = df.iloc[np.linspace(0, len(df)-1, limit, dtype=np.int64)] # exactly limit rows, incl. both ends
         colcnt -= 1 # time is always implied
         colidxs = [0] + list(range(self.col_data_offset, self.col_data_offset+colcnt))
         dfr = df.iloc[:,colidxs]
@@ -513,9 +632,9 @@ class PandasDataSource:
                     dfr[colname] = yscale.invxform(dfr.iloc[:,i])
         return dfr
 
-    def _resample(self, df, colcnt, resamp):
+    def _resample(self, df, colcnt, resamp, limit):
         cdo = self.col_data_offset
-        sample_rate = len(df) * 5 // lod_candles
+        sample_rate = len(df) * 5 // limit
         offset = len(df) % sample_rate
         dfd = df[[df.columns[0]]+[df.columns[cdo]]].iloc[offset::sample_rate]
         c = df[df.columns[cdo+1]].iloc[offset+sample_rate-1::sample_rate]
@@ -707,6 +826,7 @@ class FinPolyLine(pg.PolyLineROI):
     def __init__(self, vb, *args, **kwargs):
         self.vb = vb # init before parent constructor
         self.texts = []
+        self.prev_texts = {} # segment -> text of the segment before it
         super().__init__(*args, **kwargs)
 
     def addSegment(self, h1, h2, index=None):
@@ -718,6 +838,7 @@ class FinPolyLine(pg.PolyLineROI):
             self.texts.append(text)
         else:
             self.texts.insert(index, text)
+        self.update_prev_texts()
         self.update_text(text)
         self.vb.addItem(text, ignoreBounds=True)
 
@@ -727,17 +848,22 @@ class FinPolyLine(pg.PolyLineROI):
             if text.segment == seg:
                 self.vb.removeItem(text)
                 self.texts.remove(text)
+        self.update_prev_texts()
+
+    def update_prev_texts(self):
+        self.prev_texts = {}
+        for prev_text,text in zip(self.texts, self.texts[1:]):
+            self.prev_texts.setdefault(text.segment, prev_text)
 
     def update_text(self, text):
-        h0 = text.segment.handles[0]['item']
-        h1 = text.segment.handles[1]['item']
-        diff = h1.pos() - h0.pos()
-        if diff.y() < 0:
+        pos0 = text.segment.handles[0]['item'].pos()
+        pos1 = text.segment.handles[1]['item'].pos()
+        if pos1.y() < pos0.y():
             text.setAnchor((0.5,0))
         else:
             text.setAnchor((0.5,1))
-        text.setPos(h1.pos())
-        text.setText(_draw_line_segment_text(self, text.segment, h0.pos(), h1.pos()))
+        text.setPos(pos1)
+        text.setText(_draw_line_segment_text(self, text.segment, pos0, pos1))
 
     def update_texts(self):
         for text in self.texts:
@@ -814,6 +940,11 @@ class FinViewBox(pg.ViewBox):
         self.rois = []
         self.win._isMouseLeftDrag = False
         self.zoom_listeners = set()
+        self._linked_pending = {}
+        self._linked_timer = QtCore.QTimer(self)
+        self._linked_timer.setSingleShot(True)
+        self._linked_timer.setInterval(16) # follow linked views at most ~60 Hz
+        self._linked_timer.timeout.connect(self._apply_linked_pending)
         self.reset()
 
     def reset(self):
@@ -1001,30 +1132,45 @@ class FinViewBox(pg.ViewBox):
         super().keyPressEvent(ev)
 
     def linkedViewChanged(self, view, axis):
-        if not self.datasrc or self.updating_linked:
+        if not self.datasrc or self.updating_linked or not view or not view.datasrc:
             return
-        if view and self.datasrc and view.datasrc:
-            self.updating_linked = True
-            tr = self.targetRect()
-            vr = view.targetRect()
-            is_dirty = view.force_range_update > 0
-            is_same_scale = self.datasrc.xlen == view.datasrc.xlen
-            if is_same_scale: # stable zoom based on index
-                if is_dirty or abs(vr.left()-tr.left()) >= 1 or abs(vr.right()-tr.right()) >= 1:
-                    if is_dirty:
-                        view.force_range_update -= 1
-                    self.update_y_zoom(vr.left(), vr.right())
-            else: # sloppy one based on time stamps
-                tt0,tt1,_,_,_ = self.datasrc.hilo(tr.left(), tr.right())
-                vt0,vt1,_,_,_ = view.datasrc.hilo(vr.left(), vr.right())
-                period2 = self.datasrc.period_ns * 0.5
-                if is_dirty or abs(vt0-tt0) >= period2 or abs(vt1-tt1) >= period2:
-                    if is_dirty:
-                        view.force_range_update -= 1
-                    if self.parent():
-                        x0,x1 = _pdtime2index(self.parent(), pd.Series([vt0,vt1]), any_end=True)
-                        self.update_y_zoom(x0, x1)
-            self.updating_linked = False
+        if self._linked_timer.isActive(): # throttled; apply the last change per view when the timer fires
+            _,cnt = self._linked_pending.get(view, (axis,0))
+            self._linked_pending[view] = (axis, cnt+1)
+            return
+        self._linked_timer.start()
+        self._linked_view_changed(view, axis)
+
+    def _apply_linked_pending(self):
+        pending,self._linked_pending = self._linked_pending,{}
+        for view,(axis,cnt) in pending.items():
+            # each coalesced change would have used up one of the view's forced updates, keep the last for this one
+            if view.force_range_update > 1:
+                view.force_range_update = max(view.force_range_update-(cnt-1), 1)
+            self.linkedViewChanged(view, axis)
+
+    def _linked_view_changed(self, view, axis):
+        self.updating_linked = True
+        tr = self.targetRect()
+        vr = view.targetRect()
+        is_dirty = view.force_range_update > 0
+        is_same_scale = self.datasrc.xlen == view.datasrc.xlen
+        if is_same_scale: # stable zoom based on index
+            if is_dirty or abs(vr.left()-tr.left()) >= 1 or abs(vr.right()-tr.right()) >= 1:
+                if is_dirty:
+                    view.force_range_update -= 1
+                self.update_y_zoom(vr.left(), vr.right())
+        else: # sloppy one based on time stamps
+            tt0,tt1 = self.datasrc.time_range(tr.left(), tr.right())
+            vt0,vt1 = view.datasrc.time_range(vr.left(), vr.right())
+            period2 = self.datasrc.period_ns * 0.5
+            if is_dirty or abs(vt0-tt0) >= period2 or abs(vt1-tt1) >= period2:
+                if is_dirty:
+                    view.force_range_update -= 1
+                if self.parent():
+                    x0,x1 = _pdtime2index(self.parent(), pd.Series([vt0,vt1]), any_end=True)
+                    self.update_y_zoom(x0, x1)
+        self.updating_linked = False
 
     def zoom_rect(self, vr, scale_fact, center):
         if not self.datasrc:
@@ -1174,6 +1320,10 @@ class FinPlotItem(pg.GraphicsObject):
         self.dirty = True
         self.lod = lod
         self.cachedRect = None
+        self.pan_x = None # last visible center, to bias the cache in the panning direction
+        self.pan_dir = 0
+        self.pixmap = None
+        self.pixmap_key = None
 
     def repaint(self):
         self.dirty = True
@@ -1183,24 +1333,73 @@ class FinPlotItem(pg.GraphicsObject):
         if self.datasrc.is_sparse:
             self.dirty = True
         self.update_dirty_picture(self.viewRect())
-        p.drawPicture(0, 0, self.picture)
+        if self.picture.boundingRect().isNull(): # nothing drawn, such as labels which are child items
+            return
+        if self.datasrc.is_sparse or not p.isActive() or p.paintEngine().type() != QtGui.QPaintEngine.Type.Raster:
+            p.drawPicture(0, 0, self.picture) # keep vector output (svg, pdf, print) as vector
+        else:
+            self._paint_pixmap(p)
+
+    def _paint_pixmap(self, p):
+        # repaints of an unchanged view (crosshair moves and such) just blit the rasterized picture
+        tr = p.transform()
+        dev = p.device()
+        dpr = dev.devicePixelRatioF()
+        key = (tr, dev.width(), dev.height(), dpr)
+        if key != self.pixmap_key:
+            # cosmetic pen strokes reach past the picture bounds, so leave room for the widest pen
+            pad = ceil(max(getattr(self, 'shadow_width', 1), 1)) + 2
+            rect = tr.mapRect(self.boundingRect()).toAlignedRect().adjusted(-pad, -pad, pad, pad) & QtCore.QRect(0, 0, dev.width(), dev.height())
+            if rect.isEmpty():
+                return
+            self.pixmap = QtGui.QPixmap(rect.size() * dpr)
+            self.pixmap.setDevicePixelRatio(dpr)
+            self.pixmap.fill(QtCore.Qt.GlobalColor.transparent)
+            pp = QtGui.QPainter(self.pixmap)
+            pp.setRenderHints(p.renderHints())
+            pp.translate(-rect.left(), -rect.top())
+            pp.setTransform(tr, True)
+            pp.drawPicture(0, 0, self.picture)
+            pp.end()
+            self.pixmap_pos = rect.topLeft()
+            self.pixmap_key = key
+        p.save()
+        p.resetTransform()
+        p.drawPixmap(self.pixmap_pos, self.pixmap)
+        p.restore()
 
     def update_dirty_picture(self, visibleRect):
+        x = visibleRect.center().x()
+        if self.pan_x is not None and x != self.pan_x:
+            self.pan_dir = 1 if x > self.pan_x else -1
+        self.pan_x = x
         if self.dirty or \
             (self.lod and # regenerate when zoom changes?
                 (visibleRect.left() < self.cachedRect.left() or \
                  visibleRect.right() > self.cachedRect.right() or \
-                 visibleRect.width() < self.cachedRect.width() / cache_candle_factor)): # optimize when zooming in
+                 visibleRect.width() < 0.8 * self.cachedRect.width() / cache_candle_factor)): # optimize when zooming in, but not on every tiny step
             self._generate_picture(visibleRect)
 
     def _generate_picture(self, boundingRect):
         w = boundingRect.width()
-        self.cachedRect = QtCore.QRectF(boundingRect.left()-(cache_candle_factor-1)*0.5*w, 0, cache_candle_factor*w, 0)
+        # put most of the extra candles on the side we're panning towards
+        right_f = 0.5 + 0.3*self.pan_dir # share of the extra width to the right
+        x0 = boundingRect.left() - (cache_candle_factor-1)*(1-right_f)*w
+        x1 = x0 + cache_candle_factor*w
+        vb = self.ax.vb
+        if vb.x_indexed: # ...but not past the ends of the view's data, the other side gets that width instead
+            xmin,xmax = _xminmax(vb.datasrc or self.datasrc, x_indexed=True)
+            if x1 > xmax:
+                x0 -= x1 - max(xmax, boundingRect.right())
+            elif x0 < xmin:
+                x0 += min(xmin, boundingRect.left()) - x0
+        self.cachedRect = QtCore.QRectF(x0, 0, cache_candle_factor*w, 0)
         self.painter.begin(self.picture)
         self._generate_dummy_picture(self.viewRect())
         self.generate_picture(self.cachedRect)
         self.painter.end()
         self.dirty = False
+        self.pixmap_key = None
 
     def _generate_dummy_picture(self, boundingRect):
         if self.datasrc.is_sparse:
@@ -1237,34 +1436,64 @@ class CandlestickItem(FinPlotItem):
         self.colorfunc = colorfunc
         self.resamp = resamp
         self.x_offset = 0
+        self.pen_cache = OrderedDict()
         super().__init__(ax, datasrc, lod=True)
 
     def generate_picture(self, boundingRect):
         left,right = boundingRect.left(), boundingRect.right()
         p = self.painter
-        df,origlen = self.datasrc.rows(5, left, right, yscale=self.ax.vb.yscale, resamp=self.resamp)
+        # several candles per pixel just overdraw each other, so aggregate into pixel-wide bins
+        # (open/close/hi/lo = first/last/max/min) when there are many more candles than pixels
+        lod = True
+        vw = self.ax.vb.viewRect().width()
+        px = self.ax.vb.width() * boundingRect.width() / vw if vw > 0 else 0
+        if px >= 1:
+            lod = min(lod_candles, int(4*px))
+        df,origlen = self.datasrc.rows(5, left, right, yscale=self.ax.vb.yscale, lod=lod, resamp=self.resamp)
         f = origlen / len(df) if len(df) else 1
         w = self.candle_width * f
         w2 = w * 0.5
         for shadow,frame,body,df_rows in self.colorfunc(self, self.datasrc, df):
-            idxs = df_rows.index
-            rows = df_rows.values
-            if self.x_offset:
-                idxs += self.x_offset
+            if not len(df_rows):
+                continue
+            xs = df_rows.index.values + self.x_offset
+            _,opens,closes,highs,lows = df_rows.values[:, :5].T
             if self.draw_shadow:
-                p.setPen(pg.mkPen(shadow, width=self.shadow_width))
-                for x,(t,open,close,high,low) in zip(idxs, rows):
-                    if high > low:
-                        p.drawLine(QtCore.QPointF(x, low), QtCore.QPointF(x, high))
+                # all shadows as one path of disconnected low->high segments, built from arrays in one go
+                sel = highs > lows
+                p.setPen(self.mkpen(shadow, width=self.shadow_width))
+                p.drawPath(pg.arrayToQPath(np.repeat(xs[sel], 2), np.column_stack([lows[sel], highs[sel]]).ravel(), connect='pairs'))
             if self.draw_body:
-                p.setPen(pg.mkPen(frame))
-                p.setBrush(pg.mkBrush(body))
-                for x,(t,open,close,high,low) in zip(idxs, rows):
-                    p.drawRect(QtCore.QRectF(x-w2, open, w, close-open))
+                p.setPen(self.mkpen(frame))
+                p.setBrush(self.mkbrush(body))
+                # iterate plain lists rather than boxing each number as a numpy scalar
+                p.drawRects([QtCore.QRectF(x-w2, open, w, close-open) for x,open,close in zip(xs.tolist(), opens.tolist(), closes.tolist())])
 
     def rowcolors(self, prefix):
         return [self.colors[prefix+'_shadow'], self.colors[prefix+'_frame'], self.colors[prefix+'_body']]
 
+    def mkpen(self, color, width=1):
+        return self._cached_gfx(pg.mkPen, color, width=width)
+
+    def mkbrush(self, color):
+        return self._cached_gfx(pg.mkBrush, color)
+
+    def _cached_gfx(self, mkfunc, color, **kwargs):
+        # keyed on the color value rather than cached per role, as self.colors may be changed at any time
+        ckey = color.name(QtGui.QColor.NameFormat.HexArgb) if isinstance(color, QtGui.QColor) else color
+        try:
+            key = (mkfunc, ckey, tuple(kwargs.items()))
+            gfx = self.pen_cache.get(key)
+        except TypeError: # unhashable color spec
+            return mkfunc(color, **kwargs)
+        if gfx is None:
+            gfx = self.pen_cache[key] = mkfunc(color, **kwargs)
+            if len(self.pen_cache) > 256: # drop least recently used, as a colorfunc may produce any number of colors
+                self.pen_cache.popitem(last=False)
+        else:
+            self.pen_cache.move_to_end(key)
+        return gfx
+
 
 
 class HeatmapItem(FinPlotItem):
@@ -1285,7 +1514,7 @@ class HeatmapItem(FinPlotItem):
         df = self.datasrc.df.iloc[:, self.datasrc.col_data_offset:self.col_data_end]
         values = df.values
         # normalize
-        values -= np.nanmin(values)
+        values = values - np.nanmin(values) # don't modify the data source in place
         values = values / (np.nanmax(values) / (1+self.whiteout)) # overshoot for coloring
         lim = self.filter_limit * (1+self.whiteout)
         p = self.painter
@@ -1381,8 +1610,8 @@ class HorizontalTimeVolumeItem(CandlestickItem):
                 h0 = h * (1-self.candle_width)/2
                 h1 = h * self.candle_width
                 for shadow,frame,body,data in self.colorfunc(self, self.datasrc, np.array([prcr, volr])):
-                    p.setPen(pg.mkPen(frame))
-                    p.setBrush(pg.mkBrush(body))
+                    p.setPen(self.mkpen(frame))
+                    p.setBrush(self.mkbrush(body))
                     prcr_,volr_ = data
                     for w,y in zip(volr_, prcr_):
                         if abs(w) > 1e-15:
@@ -1391,7 +1620,7 @@ class HorizontalTimeVolumeItem(CandlestickItem):
             # draw poc line
             if self.draw_poc:
                 y = prcr[pocidx] + h / 2
-                p.setPen(pg.mkPen(poc_color))
+                p.setPen(self.mkpen(poc_color))
                 p.drawLine(QtCore.QPointF(t, y), QtCore.QPointF(t+f*self.draw_poc, y))
 
 
@@ -1413,19 +1642,22 @@ class ScatterLabelItem(FinPlotItem):
         created = 0
         for x,t,y,txt in rows:
             txt = str(txt)
+            key = x # row index, so no per-label string formatting
+            item = self.text_items.get(key)
+            if item is not None:
+                drops.discard(key)
+                if item.label == (y, txt): # only touch Qt when the label changed
+                    continue
             ishtml = '<' in txt and '>' in txt
-            key = '%s:%.8f' % (t, y)
-            if key in self.text_items:
-                item = self.text_items[key]
+            if item is not None:
                 (item.setHtml if ishtml else item.setText)(txt)
-                item.setPos(x, y)
-                drops.remove(key)
             else:
                 kws = {'html':txt} if ishtml else {'text':txt}
                 self.text_items[key] = item = pg.TextItem(color=self.color, anchor=self.anchor, **kws)
-                item.setPos(x, y)
                 item.setParentItem(self)
                 created += 1
+            item.label = (y, txt)
+            item.setPos(x, y)
         if created > 0 or self.dirty: # only reduce cache if we've added some new or updated
             self.clear_items(drops)
 
@@ -1480,13 +1712,13 @@ def create_plot_widget(master, rows=1, init_zoom_periods=1e10, yscale='linear'):
     if master not in master_data:
         master_data[master] = {}
     if isinstance(master, pg.GraphicsLayoutWidget):
-        proxy = pg.SignalProxy(master.scene().sigMouseMoved, rateLimit=144, slot=partial(_mouse_moved, master, axs[0].vb))
+        proxy = pg.SignalProxy(master.scene().sigMouseMoved, rateLimit=crosshair_rate, slot=partial(_mouse_moved, master, axs[0].vb))
         master_data[master][axs[0].vb] = dict(proxymm=proxy, last_mouse_evs=None, last_mouse_y=0)
         if 'default' not in master_data[master]:
             master_data[master]['default'] = master_data[master][axs[0].vb]
     else:
         for ax in axs:
-            proxy = pg.SignalProxy(ax.ax_widget.scene().sigMouseMoved, rateLimit=144, slot=partial(_mouse_moved, master, ax.vb))
+            proxy = pg.SignalProxy(ax.ax_widget.scene().sigMouseMoved, rateLimit=crosshair_rate, slot=partial(_mouse_moved, master, ax.vb))
             master_data[master][ax.vb] = dict(proxymm=proxy, last_mouse_evs=None, last_mouse_y=0)
     last_ax = axs[0]
     return axs[0] if len(axs) == 1 else axs
@@ -1508,19 +1740,15 @@ def close():
 
 
 def price_colorfilter(item, datasrc, df):
-    opencol = df.columns[1]
-    closecol = df.columns[2]
-    is_up = df[opencol] <= df[closecol] # open lower than close = goes up
-    yield item.rowcolors('bull') + [df.loc[is_up, :]]
-    yield item.rowcolors('bear') + [df.loc[~is_up, :]]
+    is_up = df.iloc[:, 1].values <= df.iloc[:, 2].values # open lower than close = goes up
+    yield item.rowcolors('bull') + [df[is_up]]
+    yield item.rowcolors('bear') + [df[~is_up]]
 
 
 def volume_colorfilter(item, datasrc, df):
-    opencol = df.columns[3]
-    closecol = df.columns[4]
-    is_up = df[opencol] <= df[closecol] # open lower than close = goes up
-    yield item.rowcolors('bull') + [df.loc[is_up, :]]
-    yield item.rowcolors('bear') + [df.loc[~is_up, :]]
+    is_up = df.iloc[:, 3].values <= df.iloc[:, 4].values # open lower than close = goes up
+    yield item.rowcolors('bull') + [df[is_up]]
+    yield item.rowcolors('bear') + [df[~is_up]]
 
 
 def strength_colorfilter(item, datasrc, df):
@@ -1660,9 +1888,7 @@ def heatmap(datasrc, ax=None, **kwargs):
     item.setZValue(-30)
     ax.addItem(item)
     if ax.vb.datasrc is not None and not ax.vb.datasrc.timebased(): # manual zoom update
-        ax.setXLink(None)
-        if ax.prev_ax:
-            ax.prev_ax.set_visible(xaxis=True)
+        _ax_decouple(ax)
         df = ax.vb.datasrc.df
         prices = df.columns[ax.vb.datasrc.col_data_offset:item.col_data_end]
         delta_price = abs(prices[0] - prices[1])
@@ -2046,7 +2272,8 @@ def _loadwindata(win):
         if ds and (vb.linkedView(0) is None or vb.linkedView(0).datasrc is None or vb.master_viewbox):
             period_ns = ds.period_ns
             if kvs['min_x'] >= ds.x.iloc[0]-period_ns and kvs['max_x'] <= ds.x.iloc[-1]+period_ns:
-                x0,x1 = ds.x.loc[ds.x>=kvs['min_x']].index[0], ds.x.loc[ds.x<=kvs['max_x']].index[-1]
+                xs = ds.x.values # sorted, so binary search instead of masking the whole column twice
+                x0,x1 = ds.x.index[np.searchsorted(xs, kvs['min_x'], side='left')], ds.x.index[max(np.searchsorted(xs, kvs['max_x'], side='right')-1, 0)]
                 if x1 == len(ds.x)-1:
                     x1 += right_margin_candles
                 x1 += 0.5
@@ -2065,7 +2292,7 @@ def _savewindata(win):
                 continue
             if ax.vb.datasrc is None:
                 continue
-            t0,t1,_,_,_ = ax.vb.datasrc.hilo(ax.vb.targetRect().left(), ax.vb.targetRect().right())
+            t0,t1 = ax.vb.datasrc.time_range(ax.vb.targetRect().left(), ax.vb.targetRect().right())
             min_x = np.nanmin([min_x, t0])
             max_x = np.nanmax([max_x, t1])
         if np.max(np.abs([min_x, max_x])) < 1e99:
@@ -2207,7 +2434,8 @@ def _ax_set_visible(ax, crosshair=None, xaxis=None, yaxis=None, xgrid=None, ygri
 
 
 def _ax_decouple(ax):
-    ax.setXLink(None)
+    if ax.vb.linkedView(0) is not None: # unlinking emits a state change even when already unlinked
+        ax.setXLink(None)
     if ax.prev_ax:
         ax.prev_ax.set_visible(xaxis=True)
 
@@ -2374,7 +2602,7 @@ def _set_datasrc(ax, datasrc, addcols=True):
             if addcols:
                 viewbox.datasrc.addcols(datasrc)
             else:
-                viewbox.datasrc.df = datasrc.df
+                viewbox.datasrc.set_df(datasrc.df)
             # check if we need to re-render previous plots due to changed indices
             indices_updated = viewbox.datasrc.timebased() and t0 != viewbox.datasrc.x.loc[0]
             for item in ax.items:
@@ -2393,6 +2621,7 @@ def _set_datasrc(ax, datasrc, addcols=True):
             vdf = viewbox.datasrc.df
             d = {v:k for k,v in enumerate(vdf[vdf.columns[0]])}
             datasrc.df.index = [d[i] for i in datasrc.df[datasrc.df.columns[0]]]
+            datasrc._clear_cache()
         ## if not viewbox.x_indexed:
             ## _set_x_limits(ax, datasrc)
     # update period if this datasrc has higher time resolution
@@ -2489,6 +2718,7 @@ def _adjust_horiz_datasrc(datasrc):
         nrow[-2:] = orow[-2:]
         nrow[len(orow)-2:len(orow)] = np.nan
     datasrc.df[datasrc.df.columns[1:]] = values
+    datasrc._clear_cache()
 
 
 def _adjust_bar_datasrc(datasrc, order_cols=True):
@@ -2595,8 +2825,7 @@ def _xminmax(datasrc, x_indexed, init_steps=None, extra_margin=0):
         x1 = datasrc.xlen + right_margin_candles - 1 + side_margin + extra_margin # add another margin to get the "snap back" sensation
     else:
         # x size for plain Y-over-X data (i.e. not indexed)
-        x0 = datasrc.x.min()
-        x1 = datasrc.x.max()
+        x0,x1 = datasrc.x_minmax()
         # extend margin on decoupled plots
         d = (x1-x0) * (0.2+extra_margin)
         x0 -= d
@@ -2725,7 +2954,7 @@ def _mcallback_pos(ax, callback, poss):
         t = ax.vb.datasrc.closest_time(t)
     except KeyError: # when clicking beyond right_margin_candles
         if clamp_grid:
-            t = ax.vb.datasrc.x.iloc[-1 if t > 0 else 0]
+            t = ax.vb.datasrc.edge_time(last=t > 0)
     try:
         callback(t, point.y())
     except OSError as e:
@@ -2752,37 +2981,79 @@ def _get_color(ax, style, wanted_color):
     else:
         colors = hard_colors
     if index is None:
-        avoid = set(i.opts['handed_color'] for i in ax.items if isinstance(i,pg.PlotDataItem) and get_handed_color(i) is not None and this_line==is_line(i.opts['symbol']))
-        index = len([i for i in ax.items if isinstance(i,pg.PlotDataItem) and get_handed_color(i) is None and this_line==is_line(i.opts['symbol'])])
+        # one pass over the plots of the same kind: count the auto-colored ones, collect the hand-picked ones
+        avoid = set()
+        index = 0
+        for i in ax.items:
+            if isinstance(i,pg.PlotDataItem) and this_line==is_line(i.opts['symbol']):
+                handed_color = get_handed_color(i)
+                if handed_color is None:
+                    index += 1
+                else:
+                    avoid.add(handed_color)
         while index in avoid:
             index += 1
     return colors[index%len(colors)]
 
 
+def _hilo_scan(vals):
+    '''Single pass NaN-ignoring max and min of a 2D array; NaNs if nothing found.'''
+    hi = -np.inf
+    lo = np.inf
+    for i in range(vals.shape[0]):
+        for j in range(vals.shape[1]):
+            v = vals[i,j]
+            if v > hi:
+                hi = v
+            if v < lo:
+                lo = v
+    if hi < lo: # all NaNs
+        return np.nan, np.nan
+    return hi, lo
+
+
+_hilo_kernel = None
+
+
+def _get_hilo_kernel():
+    global _hilo_kernel
+    if _hilo_kernel is None: # numba is only imported once asked for
+        try:
+            from numba import njit
+            _hilo_kernel = njit(cache=True)(_hilo_scan)
+        except ImportError:
+            _hilo_kernel = False
+    return _hilo_kernel
+
+
 def _pdtime2epoch(t):
     if isinstance(t, pd.Series):
-        if isinstance(t.iloc[0], pd.Timestamp):
-            dtype = str(t.dtype)
-            if dtype.endswith('[s]'):
-                return t.view('int64') * int(1e9)
-            elif dtype.endswith('[ms]'):
-                return t.view('int64') * int(1e6)
-            elif dtype.endswith('us'):
-                return t.view('int64') * int(1e3)
-            return t.view('int64')
-        h = np.nanmax(t.values)
-        if h < 1e10: # handle s epochs
-            return (t*1e9).astype('int64')
-        if h < 1e13: # handle ms epochs
-            return (t*1e6).astype('int64')
-        if h < 1e16: # handle us epochs
-            return (t*1e3).astype('int64')
-        return t.astype('int64')
+        if t.dtype.kind == 'M': # any datetime64 unit, tz-aware too (.values is UTC)
+            ns = t.values.astype('datetime64[ns]', copy=False).view('int64')
+            return pd.Series(ns, index=t.index, name=t.name)
+        unit = _epoch_unit_ns(np.nanmax(t.values))
+        if unit == 1: # already ns, only copy if it's not int64 yet
+            return t.astype('int64', copy=False)
+        if t.dtype.kind in 'iu': # whole s/ms/us epochs scale exactly in int64, without a pass through float
+            return t.astype('int64', copy=False) * unit
+        return (t*unit).astype('int64')
     return t
 
 
+def _epoch_unit_ns(h):
+    '''Nanoseconds per epoch unit (s, ms, us or ns), judging by the largest timestamp h.'''
+    if h < 1e10:
+        return 1_000_000_000
+    if h < 1e13:
+        return 1_000_000
+    if h < 1e16:
+        return 1_000
+    return 1
+
+
 def _pdtime2index(ax, ts, any_end=False, require_time=False):
-    if isinstance(ts.iloc[0], pd.Timestamp):
+    missing = ts.isna().values # NaT would otherwise turn into the smallest int64
+    if ts.dtype.kind == 'M' or isinstance(ts.iloc[0], pd.Timestamp):
         ts = ts.view('int64')
     else:
         h = np.nanmax(ts.values)
@@ -2790,12 +3061,9 @@ def _pdtime2index(ax, ts, any_end=False, require_time=False):
             if require_time:
                 assert False, 'not a time series'
             return ts
-        if h < 1e10: # handle s epochs
-            ts = ts.astype('float64') * 1e9
-        elif h < 1e13: # handle ms epochs
-            ts = ts.astype('float64') * 1e6
-        elif h < 1e16: # handle us epochs
-            ts = ts.astype('float64') * 1e3
+        unit = _epoch_unit_ns(h)
+        if unit > 1:
+            ts = ts.astype('int64' if ts.dtype.kind in 'iu' else 'float64') * unit
     
     datasrc = _get_datasrc(ax)
     xs = datasrc.x
@@ -2807,9 +3075,15 @@ def _pdtime2index(ax, ts, any_end=False, require_time=False):
           return exact
 
     r = []
-    for i,t in enumerate(ts):
-        xss = xs.loc[xs>t]
-        if len(xss) == 0:
+    if datasrc.index.is_monotonic_increasing and xs.is_monotonic_increasing:
+        after = np.searchsorted(xs.values, ts.values, side='right') # first row later than each t
+    else: # unsorted, so no binary search; find the first row later than each t the slow way
+        after = [np.argmax(xs.values > t) if (xs.values > t).any() else len(xs) for t in ts]
+    for i,(t,j) in enumerate(zip(ts, after)):
+        if missing[i]:
+            r.append(np.nan)
+            continue
+        if j >= len(xs):
             t0 = xs.iloc[-1]
             if any_end or t0 == t:
                 r.append(len(xs)-1)
@@ -2817,7 +3091,7 @@ def _pdtime2index(ax, ts, any_end=False, require_time=False):
             if i > 0:
                 continue
             assert t <= t0, 'must plot this primitive in prior time-range'
-        i1 = xss.index[0]
+        i1 = xs.index[j]
         i0 = i1-1
         if i0 < 0:
             i0,i1 = 0,1
@@ -2852,9 +3126,19 @@ def _millisecond_tz_wrap(s):
 
 
 def _x2local_t(datasrc, x):
+    global local_t_tz
     if display_timezone == None:
         return _x2utc(datasrc, x)
-    return _x2t(datasrc, x, lambda t: _millisecond_tz_wrap(datetime.fromtimestamp(t/1e9, tz=display_timezone).strftime(timestamp_format)))
+    if display_timezone is not local_t_tz: # tz objects aren't hashable, so flush instead of keying on it
+        _ns2local_str.cache_clear()
+        local_t_tz = display_timezone
+    return _x2t(datasrc, x, lambda t: _ns2local_str(t, timestamp_format))
+
+
+@lru_cache(maxsize=4096)
+def _ns2local_str(t, fmt):
+    # same timestamps are formatted over and over by tick labels and the crosshair
+    return _millisecond_tz_wrap(datetime.fromtimestamp(t/1e9, tz=display_timezone).strftime(fmt))
 
 
 def _x2utc(datasrc, x):
@@ -2866,23 +3150,23 @@ def _x2t(datasrc, x, ts2str):
     if not datasrc:
         return '',False
     try:
-        x += 0.5
-        t,_,_,_,cnt = datasrc.hilo(x, x)
-        if cnt:
-            if not datasrc.timebased():
-                return '%g' % t, False
-            s = ts2str(t)
-            if epoch_period >= 23*60*60: # daylight savings, leap seconds, etc
-                i = s.index(' ')
-            elif epoch_period >= 59: # consider leap seconds
-                i = s.rindex(':')
-            elif epoch_period >= 1:
-                i = s.index('.') if '.' in s else len(s)
-            elif epoch_period >= 0.001:
-                i = -3
-            else:
-                i = len(s)
-            return s[:i],True
+        t = datasrc.closest_time(x+0.5)
+        if not datasrc.timebased():
+            return '%g' % t, False
+        s = ts2str(t)
+        if epoch_period >= 23*60*60: # daylight savings, leap seconds, etc
+            i = s.index(' ')
+        elif epoch_period >= 59: # consider leap seconds
+            i = s.rindex(':')
+        elif epoch_period >= 1:
+            i = s.index('.') if '.' in s else len(s)
+        elif epoch_period >= 0.001:
+            i = -3
+        else:
+            i = len(s)
+        return s[:i],True
+    except KeyError: # no row at x
+        pass
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -2902,18 +3186,16 @@ def _round_to_significant(rng, rngmax, x, significant_decimals, significant_eps)
         x = x / (10**exp10)
         rm = int(abs(np.log10(rngmax))) if rngmax>0 else 0
         sd = min(3, sd+rm)
-        fmt = '%%%i.%ife%%i' % (sd, sd)
-        r = fmt % (x, exp10)
+        r = f'{x:{sd}.{sd}f}e{exp10}'
     else:
         eps = fmod(x, significant_eps)
         if abs(eps) >= significant_eps/2:
             # round up
             eps -= np.sign(eps)*significant_eps
         xx = x - eps
-        fmt = '%%%i.%if' % (sd, sd)
-        r = fmt % xx
+        r = f'{xx:{sd}.{sd}f}'
         if abs(x)>0 and rng<1e4 and r.startswith('0.0') and float(r[:-1]) == 0:
-            r = '%.2e' % x
+            r = f'{x:.2e}'
     return r
 
 
@@ -2955,75 +3237,66 @@ def _clamp_point(ax, p):
 
 
 def _draw_line_segment_text(polyline, segment, pos0, pos1):
+    x0,y0 = pos0.x(), pos0.y()
+    x1,y1 = pos1.x(), pos1.y()
     fsecs = None
     datasrc = polyline.vb.datasrc
     if datasrc and clamp_grid:
         try:
-            x0,x1 = pos0.x()+0.5, pos1.x()+0.5
-            t0,_,_,_,cnt0 = datasrc.hilo(x0, x0)
-            t1,_,_,_,cnt1 = datasrc.hilo(x1, x1)
-            if cnt0 and cnt1:
-                fsecs = abs(t1 - t0) / 1e9
+            t0 = datasrc.closest_time(x0+0.5)
+            t1 = datasrc.closest_time(x1+0.5)
+            fsecs = abs(t1 - t0) / 1e9
         except:
             pass
-    diff = pos1 - pos0
     if fsecs is None:
-        fsecs = abs(diff.x()*epoch_period)
-    secs = int(fsecs)
-    mins = secs//60
-    hours = mins//60
-    mins = mins%60
-    secs = secs%60
+        fsecs = abs((x1-x0)*epoch_period)
+    mins,secs = divmod(int(fsecs), 60)
+    hours,mins = divmod(mins, 60)
     if hours==0 and mins==0 and secs < 60 and epoch_period < 1:
         msecs = int((fsecs-int(fsecs))*1000)
-        ts = '%0.2i:%0.2i.%0.3i' % (mins, secs, msecs)
+        ts = f'{mins:02d}:{secs:02d}.{msecs:03d}'
     elif hours==0 and mins < 60 and epoch_period < 60:
-        ts = '%0.2i:%0.2i:%0.2i' % (hours, mins, secs)
+        ts = f'{hours:02d}:{mins:02d}:{secs:02d}'
     elif hours < 24:
-        ts = '%0.2i:%0.2i' % (hours, mins)
+        ts = f'{hours:02d}:{mins:02d}'
     else:
-        days = hours // 24
-        hours %= 24
-        ts = '%id %0.2i:%0.2i' % (days, hours, mins)
+        days,hours = divmod(hours, 24)
+        ts = f'{days}d {hours:02d}:{mins:02d}'
         if ts.endswith(' 00:00'):
             ts = ts.partition(' ')[0]
     ysc = polyline.vb.yscale
     if polyline.vb.y_positive:
-        y0,y1 = ysc.xform(pos0.y()), ysc.xform(pos1.y())
-        if y0:
-            gain = y1 / y0 - 1
+        v0,v1 = ysc.xform(y0), ysc.xform(y1)
+        if v0:
+            gain = v1 / v0 - 1
             if gain > 10:
-                value = 'x%i' % gain
+                value = f'x{int(gain)}'
             else:
-                value = '%+.2f %%' % (100 * gain)
-        elif not y1:
+                value = f'{100*gain:+.2f} %'
+        elif not v1:
             value = '0'
         else:
-            value = '+∞' if y1>0 else '-∞'
+            value = '+∞' if v1>0 else '-∞'
     else:
-        dy = ysc.xform(diff.y())
+        dy = ysc.xform(y1-y0)
         if dy and (abs(dy) >= 1e4 or abs(dy) <= 1e-2):
-            value = '%+3.3g' % dy
+            value = f'{dy:+3.3g}'
         else:
-            value = '%+2.2f' % dy
-    extra = _draw_line_extra_text(polyline, segment, pos0, pos1)
-    return '%s %s (%s)' % (value, extra, ts)
+            value = f'{dy:+2.2f}'
+    extra = _draw_line_extra_text(polyline, segment, y1-y0)
+    return f'{value} {extra} ({ts})'
 
 
-def _draw_line_extra_text(polyline, segment, pos0, pos1):
+def _draw_line_extra_text(polyline, segment, this_change):
     '''Shows the proportions of this line height compared to the previous segment.'''
-    prev_text = None
-    for text in polyline.texts:
-        if prev_text is not None and text.segment == segment:
-            h0 = prev_text.segment.handles[0]['item']
-            h1 = prev_text.segment.handles[1]['item']
-            prev_change = h1.pos().y() - h0.pos().y()
-            this_change = pos1.y() - pos0.y()
-            if not abs(prev_change) > 1e-14:
-                break
+    prev_text = polyline.prev_texts.get(segment)
+    if prev_text is not None:
+        h0 = prev_text.segment.handles[0]['item']
+        h1 = prev_text.segment.handles[1]['item']
+        prev_change = h1.y() - h0.y()
+        if abs(prev_change) > 1e-14:
             change_part = abs(this_change / prev_change)
             return ' = 1:%.2f ' % change_part
-        prev_text = text
     return ''
 
 